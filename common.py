@@ -0,0 +1,103 @@
+"""
+common.py - 各转换脚本共用的 JSON 读写与目录遍历函数。
+
+描述:
+    导入时选择可用的最快后端：已安装 orjson 时使用 orjson，否则回退到标准库 json。
+    两种后端的输出格式相同：非 ASCII 字符不转义；pretty 时缩进 2 格，否则为不带空格的紧凑格式。
+    对字符串、任意大小的整数、布尔值和 null，两种后端读取结果相同、输出逐字节一致
+    （超过 64 位的整数 orjson 无法处理，读写时都自动改用标准库 json）；
+    浮点数的写法可能不同（如 json 输出 1e-07，orjson 输出 1e-7），NaN/Infinity
+    在 json 中原样输出，在 orjson 中输出为 null。
+    输入必须是 UTF-8 编码；与原先按 utf-8 打开文件时一样，带 BOM 的文件两种后端都会报错。
+"""
+
+import json
+import os
+import re
+from typing import Any, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时回退到标准库 json
+    orjson = None
+
+# orjson 只支持 64 位以内的整数，更宽的整数读取时会被静默转为浮点数。
+# 19 位起的负数就可能越界，含有 19 位以上连续数字时改用标准库 json，保证整数原样读取
+_LONG_DIGITS_RE = re.compile(rb'\d{19,}')
+
+# 读取文件主要耗时在 I/O 上，线程数可以多于 CPU 核数
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def scandir_recursive(path: str) -> Iterator[os.DirEntry]:
+    """
+    递归遍历目录，按 os.walk 的顺序（先本层文件，再逐个子目录）产出文件的 DirEntry。
+    符号链接（文件或目录）直接跳过，避免为解析链接目标额外调用 stat()。
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        if entry.is_symlink():
+            continue
+        if entry.is_file(follow_symlinks=False):
+            yield entry
+        elif entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+    for subdir in subdirs:
+        yield from scandir_recursive(subdir)
+
+
+def fastloads(content: bytes) -> Any:
+    """解析 JSON 字节串。失败时抛出 json.JSONDecodeError（orjson 的异常是其子类）或 UnicodeDecodeError。"""
+    if orjson and not _LONG_DIGITS_RE.search(content):
+        return orjson.loads(content)
+    # 先按 UTF-8 解码再解析：json.loads 直接处理字节串时会自动识别并接受 BOM 和 UTF-16/32
+    return json.loads(content.decode('utf-8'))
+
+
+def fastdumps(obj: Any, pretty: bool = False) -> bytes:
+    """将 obj 编码为 UTF-8 JSON 字节串。orjson 无法编码的对象（如超过 64 位的整数）改用标准库 json 编码。"""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option)
+        except orjson.JSONEncodeError:
+            pass
+    if pretty:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+    return text.encode('utf-8')
+
+
+def fastdump(obj: Any, path, pretty: bool = True) -> None:
+    """将 obj 编码为 JSON 后一次性写入 path。"""
+    with open(path, 'wb') as f:
+        f.write(fastdumps(obj, pretty))
+
+
+def fastdump_iter(items: Iterable[Any], path, pretty: bool = True) -> int:
+    """
+    将 items 逐条编码，作为一个 JSON 数组流式写入 path，返回写入的条数。
+    输出与 fastdump(list(items), path, pretty) 逐字节一致，但不需要同时在内存中保留整个列表和编码结果。
+    """
+    # pretty 时数组元素缩进 2 格，元素自身的每一行也整体右移 2 格
+    first, sep = (b"\n  ", b",\n  ") if pretty else (b"", b",")
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(b"[")
+        for item in items:
+            data = fastdumps(item, pretty)
+            if pretty:
+                data = data.replace(b"\n", b"\n  ")
+            f.write(sep if count else first)
+            f.write(data)
+            count += 1
+        f.write(b"\n]" if pretty and count else b"]")
+    return count
@@ -3,41 +3,56 @@
 merge_zzz.py - 合并指定路径下所有 *_zzz.json 文件中的列表，生成新的 xxx_zzz.json 文件。
 
 用法:
-    python merge_zzz.py <路径>
+    python merge_zzz.py <路径> [--compact] [--jsonl]
 
 参数:
     <路径>         包含 *_zzz.json 文件的目录（递归搜索）
+    --compact      输出不带缩进的紧凑 JSON，体积更小、写入更快
+    --jsonl        额外输出 <文件夹名>_zzz.jsonl，每行一条记录
 
 描述:
     遍历给定路径（包括子目录）下所有文件名匹配 *_zzz.json 的文件。
     每个文件的根元素必须是列表，将所有列表合并为一个新列表。
     输出文件名为 <路径最后一个文件夹名>_zzz.json，保存在当前工作目录。
     例如：路径为 raw/滋孽卡牌EA阶段JSON文件1.1/领域，则输出 领域_zzz.json。
+    指定 --jsonl 时额外输出同名的 .jsonl 文件（JSON Lines）。下游工具可以逐行读取，
+    追加新记录时也只需在末尾写入新行，无需重新解析和改写整个文件。
 """
 
 import argparse
+import contextlib
 import json
+import logging
 import os
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Any
+from typing import BinaryIO, Iterable, Iterator, List, Any, Optional
+
+from common import MAX_WORKERS, fastdump_iter, fastdumps, fastloads, scandir_recursive
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ijson
+except ImportError:  # 未安装 ijson 时所有文件都整体读取
+    ijson = None
+
+# 安装了 ijson 时，超过该大小（字节）的文件流式解析，避免整个文件和解析结果同时驻留内存
+STREAM_THRESHOLD = 64 * 1024 * 1024
 
 
 def find_zzz_files(root_path: str) -> List[str]:
     """递归查找所有 *_zzz.json 文件"""
-    zzz_files = []
-    for dirpath, _, filenames in os.walk(root_path):
-        for filename in filenames:
-            if filename.endswith('_zzz.json'):
-                zzz_files.append(os.path.join(dirpath, filename))
-    return zzz_files
+    return [entry.path for entry in scandir_recursive(root_path) if entry.name.endswith('_zzz.json')]
 
 
 def load_json_list(filepath: str) -> List[Any]:
     """加载 JSON 文件，确保根元素是列表，返回该列表"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        content = Path(filepath).read_bytes()
+        data = fastloads(content)
     except (json.JSONDecodeError, UnicodeDecodeError) as e:
         raise ValueError(f"文件 {filepath} 不是有效的 JSON: {e}")
     if not isinstance(data, list):
@@ -45,17 +60,84 @@ def load_json_list(filepath: str) -> List[Any]:
     return data
 
 
-def merge_zzz_files(filepaths: List[str]) -> List[Any]:
-    """合并多个 JSON 文件中的列表"""
-    merged = []
-    for fp in filepaths:
+def check_json_list(filepath: str) -> None:
+    """
+    使用 ijson 流式扫描整个 JSON 文件，不构建任何对象，只校验语法。
+    根元素不是列表或解析失败时抛出 ValueError。
+    """
+    with open(filepath, 'rb') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        if first != b'[':
+            raise ValueError(f"文件 {filepath} 的根元素不是列表")
+        f.seek(0)
+        try:
+            for _ in ijson.basic_parse(f):
+                pass
+        except (ijson.JSONError, UnicodeDecodeError) as e:
+            raise ValueError(f"文件 {filepath} 不是有效的 JSON: {e}")
+
+
+def iter_json_list(filepath: str) -> Iterator[Any]:
+    """使用 ijson 流式解析 JSON 文件，逐条产出根列表中的元素。调用前应先用 check_json_list 校验。"""
+    with open(filepath, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+
+def _iter_file(fp: str, future: Optional[Future]) -> Iterator[Any]:
+    """产出单个文件中的记录；future 为 None 表示该文件流式解析。无效的文件给出警告后整个跳过"""
+    if future is None:
+        # 先校验整个文件再产出记录，无效文件与整体读取时一样整个跳过，不会只合并前半部分
         try:
-            lst = load_json_list(fp)
-            merged.extend(lst)
-            print(f"已加载 {fp}，包含 {len(lst)} 条记录")
+            check_json_list(fp)
         except ValueError as e:
-            print(f"警告: 跳过文件 {fp}: {e}", file=sys.stderr)
-    return merged
+            logger.warning("警告: 跳过文件 %s: %s", fp, e)
+            return
+        count = 0
+        for item in iter_json_list(fp):
+            count += 1
+            yield item
+        print(f"已流式加载 {fp}，包含 {count} 条记录")
+        return
+
+    try:
+        lst = future.result()
+    except ValueError as e:
+        logger.warning("警告: 跳过文件 %s: %s", fp, e)
+        return
+    yield from lst
+    print(f"已加载 {fp}，包含 {len(lst)} 条记录")
+
+
+def merge_zzz_files(filepaths: List[str]) -> Iterator[Any]:
+    """
+    合并多个 JSON 文件中的列表，按文件顺序逐条产出记录。
+    普通文件在线程池中并行整体读取，但最多提前提交 MAX_WORKERS 个文件，每个文件的记录产出后即释放，
+    因此内存中同时最多保留 MAX_WORKERS 个文件的解析结果，而不是全部文件。
+    安装了 ijson 时，超过 STREAM_THRESHOLD 的文件流式解析。
+    无效的文件无论大小都整个跳过并给出警告。
+    """
+    streamed = set()
+    if ijson is not None:
+        streamed = {fp for fp in filepaths if os.path.getsize(fp) > STREAM_THRESHOLD}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # 按文件顺序排队的 (路径, future)，流式文件不提交到线程池
+        pending = deque()
+        for fp in filepaths:
+            pending.append((fp, None if fp in streamed else executor.submit(load_json_list, fp)))
+            if len(pending) >= MAX_WORKERS:
+                yield from _iter_file(*pending.popleft())
+        while pending:
+            yield from _iter_file(*pending.popleft())
+
+
+def tee_jsonl(items: Iterable[Any], f: BinaryIO) -> Iterator[Any]:
+    """原样产出 items，同时将每条记录作为一行写入 JSON Lines 文件 f"""
+    for item in items:
+        f.write(fastdumps(item))
+        f.write(b"\n")
+        yield item
 
 
 def get_output_path(input_path: str) -> Path:
@@ -83,7 +165,11 @@ def get_output_path(input_path: str) -> Path:
 def main():
     parser = argparse.ArgumentParser(description="合并指定路径下所有 *_zzz.json 文件中的列表")
     parser.add_argument('path', help='包含 *_zzz.json 文件的目录路径')
+    parser.add_argument('--compact', action='store_true', help='输出不带缩进的紧凑 JSON（默认缩进 2 格）')
+    parser.add_argument('--jsonl', action='store_true', help='额外输出每行一条记录的 _zzz.jsonl 文件')
     args = parser.parse_args()
+    # 警告统一经 logging 输出到 stderr，只保留消息本身
+    logging.basicConfig(format='%(message)s')
 
     if not os.path.exists(args.path):
         print(f"错误: 路径不存在: {args.path}", file=sys.stderr)
@@ -99,15 +185,31 @@ def main():
     for f in zzz_files:
         print(f"  {f}")
 
-    # 合并
-    merged_list = merge_zzz_files(zzz_files)
-    print(f"合并后总计 {len(merged_list)} 条记录")
-
     # 确定输出文件路径
     output_path = get_output_path(args.path)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(merged_list, f, ensure_ascii=False, indent=2)
+    jsonl_path = output_path.with_suffix('.jsonl')
+
+    # 合并，边读取边写入，不在内存中保留完整的合并结果。
+    # 先写入同目录下的临时文件，全部成功后再替换，中途出错时保留原有的输出文件
+    tmp_output_path = output_path.with_name(output_path.name + '.tmp')
+    tmp_jsonl_path = jsonl_path.with_name(jsonl_path.name + '.tmp')
+    try:
+        records = merge_zzz_files(zzz_files)
+        with open(tmp_jsonl_path, 'wb') if args.jsonl else contextlib.nullcontext() as jsonl_file:
+            if jsonl_file is not None:
+                records = tee_jsonl(records, jsonl_file)
+            count = fastdump_iter(records, tmp_output_path, pretty=not args.compact)
+    except BaseException:
+        tmp_output_path.unlink(missing_ok=True)
+        tmp_jsonl_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_output_path, output_path)
+    if args.jsonl:
+        os.replace(tmp_jsonl_path, jsonl_path)
+    print(f"合并后总计 {count} 条记录")
     print(f"结果已保存到 {output_path}")
+    if args.jsonl:
+        print(f"JSON Lines 结果已保存到 {jsonl_path}")
 
 
 if __name__ == '__main__':
@@ -3,7 +3,7 @@
 zzz2keyword.py - 读取JSON文件，应用工作函数生成关键词列表，并保存为 _keyword.json 文件。
 
 用法:
-    python zzz2keyword.py <输入JSON文件路径>
+    python zzz2keyword.py <输入JSON文件路径> [--compact]
 
 描述:
     读取指定的JSON文件（根元素可以是列表或字典），将其传递给工作函数 work()，
@@ -19,13 +19,16 @@ import argparse
 import json
 import os
 import sys
+from pathlib import Path
 from typing import Any, List, Union
 
+from common import fastdump, fastloads
+
 
 def load_json_file(filepath: str) -> Union[dict, list]:
     """读取JSON文件，返回解析后的字典或列表。"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    content = Path(filepath).read_bytes()
+    return fastloads(content)
 
 def work(data: Union[dict, list]) -> List[Any]:
     """
@@ -52,10 +55,7 @@ def work(data: Union[dict, list]) -> List[Any]:
             typ += "-" + d.get("领域", "")
         dic["category"] = typ
 
-        desc = ""
-        for k,v in d.items():
-            if k != "名称":
-                desc += f"{k}:{v}\n"
+        desc = "\n".join(f"{k}:{v}" for k, v in d.items() if k != "名称")
         dic["description"] = desc.strip()
         dic["display"] = "normal"
         lst.append(dic)
@@ -68,6 +68,7 @@ def main():
         description="读取JSON文件，应用工作函数生成关键词列表，并保存为 _keyword.json 文件。"
     )
     parser.add_argument('input', help='输入JSON文件路径')
+    parser.add_argument('--compact', action='store_true', help='输出不带缩进的紧凑 JSON（默认缩进 2 格）')
     args = parser.parse_args()
 
     input_path = args.input
@@ -99,8 +100,7 @@ def main():
     output_path = os.path.join(input_dir, output_filename)
 
     # 写入JSON文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(result_list, f, ensure_ascii=False, indent=2)
+    fastdump(result_list, output_path, pretty=not args.compact)
 
     print(f"结果已保存到 {output_path}")
     print(f"共生成 {len(result_list)} 条记录")
@@ -1,160 +1,155 @@
-import json
+import argparse
 import re
 import os
-import sys
+import logging
+
+from common import fastdump, fastloads
+
+logger = logging.getLogger(__name__)
+
+# Experiences are separated by Chinese or English commas
+_SPLIT_COMMA = re.compile(r'[，,]')
+# Fear cost mentioned in a trait description, e.g. "花费 1 恐惧点"
+_COST_RE = re.compile(r"花费\s*(\d+)\s*恐惧点")
 
 def convert_enemy(src):
-    dest = {}
-    
-    # Basic mappings
-    dest["name"] = src.get("名称", "")
-    dest["rank"] = src.get("位阶", "")
-    dest["type"] = src.get("种类", "")
-    dest["description"] = src.get("简介", "")
-    dest["motivation"] = src.get("动机与战术", "")
-    dest["difficulty"] = src.get("难度", "")
-    
     # Threshold combination
     heavy = src.get("重度伤害阈值", "")
     severe = src.get("严重伤害阈值", "")
-    dest["threshold"] = f"{heavy}/{severe}"
-    
-    dest["health"] = src.get("生命点", "")
-    dest["stress"] = src.get("压力点", "")
-    
+
     # Attack Bonus cleanup
     attack_bonus = src.get("攻击命中", "")
     if attack_bonus and attack_bonus.startswith("+"):
         attack_bonus = attack_bonus[1:]
-    dest["attackBonus"] = attack_bonus
-    
-    dest["weaponName"] = src.get("攻击武器", "")
-    dest["weaponRange"] = src.get("攻击范围", "")
-    dest["damageDice"] = src.get("攻击伤害", "")
-    dest["damageType"] = src.get("攻击属性", "")
-    
-    # Default styling
-    dest["decoratorColor"] = "#8a1c1c"
-    dest["highlightBgColor"] = "#852020"
-    dest["highlightTextColor"] = "#ffffff"
-    dest["isNPC"] = False
-    dest["imageSrc"] = "about:blank"
-    dest["imageTransform"] = ""
-    dest["imageSettings"] = {
-        "width": "150",
-        "height": "150",
-        "shape": "circle",
-        "hideBorder": False
-    }
-    
+
     # Experiences list
     experiences_str = src.get("经历", "")
     if experiences_str:
         # Split by Chinese comma or English comma
-        experiences = re.split(r'[，,]', experiences_str)
-        dest["experiences"] = [e.strip() for e in experiences if e.strip()]
+        experiences = (e.strip() for e in _SPLIT_COMMA.split(experiences_str))
+        experiences = [e for e in experiences if e]
     else:
-        dest["experiences"] = []
-        
+        experiences = []
+
     # Traits
-    dest["traits"] = []
+    traits = []
     for trait in src.get("特性", []):
-        new_trait = {}
-        new_trait["name"] = trait.get("名称", "")
-        
         t_type = trait.get("类型", "")
         t_desc = trait.get("特性描述", "")
-        if t_type:
-            new_trait["desc"] = f"{t_type}：{t_desc}"
-        else:
-            new_trait["desc"] = t_desc
-            
-        new_trait["flavor"] = ""
-        dest["traits"].append(new_trait)
-        
-    dest["specialTraits"] = []
-    
-    return dest
+        traits.append({
+            "name": trait.get("名称", ""),
+            "desc": f"{t_type}：{t_desc}" if t_type else t_desc,
+            "flavor": "",
+        })
 
-def convert_environment(src):
-    dest = {}
-    
-    dest["name"] = src.get("名称", "")
-    dest["nameEn"] = src.get("原文", "")
-    dest["rank"] = src.get("位阶", "")
-    dest["type"] = src.get("种类", "")
-    dest["description"] = src.get("简介", "")
-    dest["tendencies"] = src.get("趋向", "")
-    dest["difficulty"] = src.get("难度", "")
-    dest["enemies"] = src.get("潜在敌人", "")
-    
-    # Default styling for environments
-    dest["decoratorColor"] = "#1c538a"
-    dest["highlightBgColor"] = "#852020"
-    dest["highlightTextColor"] = "#ffffff"
-    dest["imageSettings"] = {
-        "src": "",
-        "width": "350",
-        "height": "200",
-        "transform": "",
-        "hideBorder": False
+    return {
+        # Basic mappings
+        "name": src.get("名称", ""),
+        "rank": src.get("位阶", ""),
+        "type": src.get("种类", ""),
+        "description": src.get("简介", ""),
+        "motivation": src.get("动机与战术", ""),
+        "difficulty": src.get("难度", ""),
+        "threshold": f"{heavy}/{severe}",
+        "health": src.get("生命点", ""),
+        "stress": src.get("压力点", ""),
+        "attackBonus": attack_bonus,
+        "weaponName": src.get("攻击武器", ""),
+        "weaponRange": src.get("攻击范围", ""),
+        "damageDice": src.get("攻击伤害", ""),
+        "damageType": src.get("攻击属性", ""),
+        # Default styling
+        "decoratorColor": "#8a1c1c",
+        "highlightBgColor": "#852020",
+        "highlightTextColor": "#ffffff",
+        "isNPC": False,
+        "imageSrc": "about:blank",
+        "imageTransform": "",
+        "imageSettings": {
+            "width": "150",
+            "height": "150",
+            "shape": "circle",
+            "hideBorder": False
+        },
+        "experiences": experiences,
+        "traits": traits,
+        "specialTraits": [],
     }
 
+def convert_environment(src):
     # Traits
-    dest["traits"] = []
+    traits = []
     for trait in src.get("特性", []):
-        new_trait = {}
         # Name + En Name
         trait_name = trait.get("名称", "")
         trait_en = trait.get("原名", "")
-        if trait_en:
-            new_trait["name"] = f"{trait_name} {trait_en}"
-        else:
-            new_trait["name"] = trait_name
-            
-        new_trait["type"] = trait.get("类型", "")
-        
+
         # Infer fear and cost from description or type, but here simple heuristics or defaults
         # The prompt target format has "fear": true/false and "cost": "0"/"1"
         # We can try to regex extract cost from description if present
         desc = trait.get("特性描述", "")
-        cost_match = re.search(r"花费\s*(\d+)\s*恐惧点", desc)
-        if cost_match:
-            new_trait["fear"] = True
-            new_trait["cost"] = cost_match.group(1)
-        else:
-            new_trait["fear"] = False
-            new_trait["cost"] = "0"
+        cost_match = _COST_RE.search(desc)
 
-        new_trait["desc"] = desc
-        new_trait["qs"] = trait.get("特性问题", "")
-        
-        dest["traits"].append(new_trait)
+        traits.append({
+            "name": f"{trait_name} {trait_en}" if trait_en else trait_name,
+            "type": trait.get("类型", ""),
+            "fear": bool(cost_match),
+            "cost": cost_match.group(1) if cost_match else "0",
+            "desc": desc,
+            "qs": trait.get("特性问题", ""),
+        })
 
-    return dest
+    return {
+        "name": src.get("名称", ""),
+        "nameEn": src.get("原文", ""),
+        "rank": src.get("位阶", ""),
+        "type": src.get("种类", ""),
+        "description": src.get("简介", ""),
+        "tendencies": src.get("趋向", ""),
+        "difficulty": src.get("难度", ""),
+        "enemies": src.get("潜在敌人", ""),
+        # Default styling for environments
+        "decoratorColor": "#1c538a",
+        "highlightBgColor": "#852020",
+        "highlightTextColor": "#ffffff",
+        "imageSettings": {
+            "src": "",
+            "width": "350",
+            "height": "200",
+            "transform": "",
+            "hideBorder": False
+        },
+        "traits": traits,
+    }
 
-    return dest
+# Converter for each supported item type ("类型")
+_CONVERTERS = {
+    "敌人": convert_enemy,
+    "环境": convert_environment,
+}
 
 def process_item(item):
     item_type = item.get("类型")
-    if item_type == "敌人":
-        return convert_enemy(item)
-    elif item_type == "环境":
-        return convert_environment(item)
-    else:
-        # If type is unknown or missing, maybe try to guess or skip?
-        # For now, let's assume if it has "名称" and "特性", it might be one of them.
-        # But based on user feedback, we strictly switch on type.
-        # If unknown, we could return None and filter it out, or just pass it through/error.
-        print(f"Warning: Unknown item type '{item_type}' for item '{item.get('名称', 'Unknown')}'. Skipping.")
-        return None
+    fn = _CONVERTERS.get(item_type)
+    if fn:
+        return fn(item)
+    # If type is unknown or missing, maybe try to guess or skip?
+    # For now, let's assume if it has "名称" and "特性", it might be one of them.
+    # But based on user feedback, we strictly switch on type.
+    # If unknown, we could return None and filter it out, or just pass it through/error.
+    logger.warning("Warning: Unknown item type '%s' for item '%s'. Skipping.", item_type, item.get('名称', 'Unknown'))
+    return None
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python zzz2rink.py <input_json_file>")
-        return
+    # Warnings go through logging to stderr, message text only
+    logging.basicConfig(format='%(message)s')
+
+    parser = argparse.ArgumentParser(description="Convert zzz enemy/environment JSON to rink format.")
+    parser.add_argument('input_file', help='input JSON file')
+    parser.add_argument('--compact', action='store_true', help='write JSON without indentation (default: 2-space indent)')
+    args = parser.parse_args()
 
-    input_file = sys.argv[1]
+    input_file = args.input_file
     
     # Determine output filename: place in rink/ folder with same basename
     basename = os.path.basename(input_file)
@@ -168,8 +163,9 @@ def main():
         return
 
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            source_data = json.load(f)
+        with open(input_file, 'rb') as f:
+            content = f.read()
+        source_data = fastloads(content)
             
         converted_data = []
         if isinstance(source_data, list):
@@ -188,8 +184,7 @@ def main():
         # Ensure directory exists
         os.makedirs(output_dir, exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(converted_data, f, ensure_ascii=False, indent=2)
+        fastdump(converted_data, output_file, pretty=not args.compact)
             
         print(f"Successfully converted {len(converted_data)} items to '{output_file}'.")
         
@@ -3,12 +3,13 @@
 zzz2rrr.py - 处理JSON文件或文件夹，合并数据并应用工作函数。
 
 用法:
-    python zzz2rrr.py <输入路径> [--zzz | --rrr]
+    python zzz2rrr.py <输入路径> [--zzz | --rrr] [--compact]
 
 参数:
     <输入路径>          JSON文件或包含JSON文件的文件夹
     --zzz              使用zzz模式调用工作函数
     --rrr              使用rrr模式调用工作函数
+    --compact          输出不带缩进的紧凑JSON，体积更小、写入更快
 
 描述:
     读取输入路径下的所有JSON文件。每个JSON文件可以是字典或列表。
@@ -18,18 +19,35 @@ zzz2rrr.py - 处理JSON文件或文件夹，合并数据并应用工作函数。
 
 import argparse
 import json
+import logging
 import os
+import re
 import sys
 import zipfile
 import datetime
 import uuid
-from typing import Union, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional, Union, List, Dict, Any
+
+from common import MAX_WORKERS, fastdump, fastloads, scandir_recursive
+
+logger = logging.getLogger(__name__)
+
+# 主职领域的各种分隔符统一为 "+"，并去掉空格
+_DOMAIN_TABLE = str.maketrans({"&": "+", "和": "+", "，": "+", ",": "+", " ": None})
+
+# 子职等级在 zzz 与 rrr 格式中的不同叫法
+_LEVEL_ZZZ2RRR = {"基础": "基石", "进阶": "专精", "精通": "大师"}
+_LEVEL_RRR2ZZZ = {v: k for k, v in _LEVEL_ZZZ2RRR.items()}
+_LEVEL_ZZZ_RE = re.compile("|".join(_LEVEL_ZZZ2RRR))
+_LEVEL_RRR_RE = re.compile("|".join(_LEVEL_RRR2ZZZ))
 
 
 def load_json_file(filepath: str) -> Union[Dict, List]:
     """读取JSON文件，返回解析后的字典或列表。"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    content = Path(filepath).read_bytes()
+    return fastloads(content)
 
 
 def load_dhcb_file(filepath: str) -> Union[Dict, List]:
@@ -49,9 +67,8 @@ def load_dhcb_file(filepath: str) -> Union[Dict, List]:
                     raise ValueError(f"ZIP文件中未找到cards.json或任何JSON文件")
             # 选择第一个（假设是card.json）
             target = candidates[0]
-            with zf.open(target) as f:
-                content = f.read().decode('utf-8')
-                return json.loads(content)
+            content = zf.read(target)
+        return fastloads(content)
     except zipfile.BadZipFile:
         raise ValueError(f"文件不是有效的ZIP压缩包: {filepath}")
     except json.JSONDecodeError as e:
@@ -86,20 +103,23 @@ def collect_data(input_path: str) -> List[Any]:
             raise ValueError(f"文件 {input_path} 的根元素既不是字典也不是列表")
     elif os.path.isdir(input_path):
         # 遍历文件夹
-        for root, dirs, files in os.walk(input_path):
-            for file in files:
-                if file.lower().endswith('.json'):
-                    filepath = os.path.join(root, file)
-                    try:
-                        data = load_json_file(filepath)
-                        if isinstance(data, dict):
-                            all_data.append(data)
-                        elif isinstance(data, list):
-                            all_data.extend(data)
-                        else:
-                            print(f"警告: {filepath} 的根元素既不是字典也不是列表，已跳过", file=sys.stderr)
-                    except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                        print(f"警告: 无法解析 {filepath}: {e}", file=sys.stderr)
+        filepaths = [entry.path for entry in scandir_recursive(input_path)
+                     if entry.name.lower().endswith('.json')]
+        # 并行读取，按文件顺序合并
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(load_json_file, fp) for fp in filepaths]
+        for filepath, future in zip(filepaths, futures):
+            try:
+                data = future.result()
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                logger.warning("警告: 无法解析 %s: %s", filepath, e)
+                continue
+            if isinstance(data, dict):
+                all_data.append(data)
+            elif isinstance(data, list):
+                all_data.extend(data)
+            else:
+                logger.warning("警告: %s 的根元素既不是字典也不是列表，已跳过", filepath)
     else:
         raise FileNotFoundError(f"输入路径不存在: {input_path}")
     return all_data
@@ -108,6 +128,119 @@ def gen_uuid() -> int:
     """生成唯一ID（使用UUID v4）。"""
     return str(uuid.uuid4().int) # pyright: ignore[reportReturnType]
 
+def _zzz_profession(d: Dict, dict_out: Dict, seen: Dict[str, set]) -> None:
+    get = d.get
+    name_ = get("名称", "")
+    if name_ not in seen["professions"]:
+        seen["professions"].add(name_)
+        dict_out["customFieldDefinitions"]["professions"].append(name_)
+    domain_parts = get("领域", "").translate(_DOMAIN_TABLE).split("+")
+    dict_out["profession"].append({
+        "id": gen_uuid(),
+        "名称": name_,
+        "领域1": domain_parts[0] if len(domain_parts) > 0 else "",
+        "领域2": domain_parts[1] if len(domain_parts) > 1 else "",
+        "起始生命": int(get("初始生命点", "")),
+        "起始闪避": int(get("初始闪避值", "")),
+        "起始物品": get("初始物品", " "),
+        "简介": get("简介", "N/A"),
+        "希望特性": get("希望特性", ""),
+        "职业特性": get("职业特性", ""),
+        "imageUrl": "",
+    })
+
+def _zzz_ancestry(d: Dict, dict_out: Dict, seen: Dict[str, set]) -> None:
+    get = d.get
+    name_ = get("名称", "")
+    intro = get("简介", "N/A")
+    if name_ not in seen["ancestries"]:
+        seen["ancestries"].add(name_)
+        dict_out["customFieldDefinitions"]["ancestries"].append(name_)
+    features = get("描述", "").replace(":", "：").replace("\n\n", "\n").split("\n")
+    # 种族描述中的前两条特性分别输出为类别 1 和类别 2
+    for category, feature in ((1, features[0]), (2, features[1])):
+        feature = feature.split("：")
+        dict_out["ancestry"].append({
+            "id": gen_uuid(),
+            "名称": feature[0],
+            "种族": name_,
+            "简介": intro,
+            "效果": feature[1],
+            "类别": category,
+            "imageUrl": "",
+        })
+
+def _zzz_community(d: Dict, dict_out: Dict, seen: Dict[str, set]) -> None:
+    get = d.get
+    name_ = get("名称", "")
+    if name_ not in seen["communities"]:
+        seen["communities"].add(name_)
+        dict_out["customFieldDefinitions"]["communities"].append(name_)
+    feature = get("描述", "")
+    f_name, f_desc = feature.split("：", 1) if "：" in feature else (feature, "")
+    dict_out["community"].append({
+        "id": gen_uuid(),
+        "名称": name_,
+        "特性": f_name,
+        "简介": get("简介", "N/A"),
+        "描述": f_desc,
+        "imageUrl": "",
+    })
+
+def _zzz_subclass(d: Dict, dict_out: Dict, seen: Dict[str, set]) -> None:
+    get = d.get
+    name_ = get("名称", "")
+    cast = get("施法属性", "")
+    dict_out["subclass"].append({
+        "id": gen_uuid(),
+        "名称": name_,
+        "描述": get("描述", ""),
+        "主职": get("主职", ""),
+        "子职业": name_.split("-")[0] if "-" in name_ else name_,
+        "等级": _LEVEL_ZZZ_RE.sub(lambda m: _LEVEL_ZZZ2RRR[m.group()], get("等级", "")),
+        "施法": cast if cast else "不可施法",
+        "imageUrl": "",
+    })
+
+def _zzz_domain(d: Dict, dict_out: Dict, seen: Dict[str, set]) -> None:
+    get = d.get
+    domain = get("领域", "")
+    if domain not in seen["domains"]:
+        seen["domains"].add(domain)
+        dict_out["customFieldDefinitions"]["domains"].append(domain)
+    recall = get("回想", "")
+    dict_out["domain"].append({
+        "id": gen_uuid(),
+        "名称": get("名称", ""),
+        "领域": domain,
+        "等级": int(get("等级", "")),
+        "属性": get("属性", ""),
+        "回想": int(recall) if recall.isdigit() else recall,
+        "描述": get("描述", ""),
+        "imageUrl": "",
+    })
+
+def _zzz_variant(d: Dict, dict_out: Dict, seen: Dict[str, set]) -> None:
+    get = d.get
+    type_ = get("类型", "")
+    if type_ not in seen["variants"]:
+        seen["variants"].add(type_)
+        dict_out["customFieldDefinitions"]["variants"].append(type_)
+    info = get("简略信息", "")
+    attr_parts = info.split("/") if info else []
+    d["效果"] = get("特性", "")
+    d["简略信息"] = {f"item{i}": part for i, part in enumerate(attr_parts)}
+    dict_out["variant"].append({"id": gen_uuid(), "名称": get("名称", ""), **d})
+
+# 按“类型”分派的处理函数，未列出的类型都作为 variant 处理
+_ZZZ_HANDLERS: Dict[str, Callable[[Dict, Dict, Dict[str, set]], None]] = {
+    "主职": _zzz_profession,
+    "种族": _zzz_ancestry,
+    "社群": _zzz_community,
+    "子职": _zzz_subclass,
+    "领域卡": _zzz_domain,
+}
+
 def work_zzz(data: List[Any], input_path: str = "") -> Any:
     """
     将zzz格式转换为rrr格式。
@@ -141,166 +274,113 @@ def work_zzz(data: List[Any], input_path: str = "") -> Any:
         "domain": [],
         "variant": []
     }
+    # customFieldDefinitions 中各列表的去重集合，避免逐个扫描列表
+    seen = {k: set() for k in dict_out["customFieldDefinitions"]}
     for d in data:
-        type_ = d.get("类型", "")
-        name_ = d.get("名称", "")
-        dict_in = {}
-        dict_in["id"] = gen_uuid()
-        dict_in["名称"] = name_
-        if type_ == "主职":
-            if name_ not in dict_out["customFieldDefinitions"]["professions"]:
-                dict_out["customFieldDefinitions"]["professions"].append(name_)
-            domain = d.get("领域", "").replace("&", "+").replace("和", "+").replace("，", "+").replace(",", "+").replace(" ","").replace("&", "+")
-            domain_parts = domain.split("+")
-            dict_in["领域1"] = domain_parts[0] if len(domain_parts) > 0 else ""
-            dict_in["领域2"] = domain_parts[1] if len(domain_parts) > 1 else ""
-            dict_in["起始生命"] = int(d.get("初始生命点", ""))
-            dict_in["起始闪避"] = int(d.get("初始闪避值", ""))
-            dict_in["起始物品"] = d.get("初始物品", " ")
-            dict_in["简介"] = d.get("简介", "N/A")
-            dict_in["希望特性"] = d.get("希望特性", "")
-            dict_in["职业特性"] = d.get("职业特性", "")
-            dict_in["imageUrl"] = ""
-            dict_out["profession"].append(dict_in)
-        elif type_ == "种族":
-            if name_ not in dict_out["customFieldDefinitions"]["ancestries"]:
-                dict_out["customFieldDefinitions"]["ancestries"].append(name_)
-            features = d.get("描述", "").replace(":", "：").replace("\n\n", "\n").split("\n")
-            feature = features[0].split("：")
-            dict_in["名称"] = feature[0]
-            dict_in["种族"] = name_
-            dict_in["简介"] = d.get("简介", "N/A")
-            dict_in["效果"] = feature[1]
-            dict_in["类别"] = 1
-            dict_in["imageUrl"] = ""
-            dict_out["ancestry"].append(dict_in)
-
-            dict_in = {}
-            feature = features[1].split("：")
-            dict_in["id"] = gen_uuid()
-            dict_in["名称"] = feature[0]
-            dict_in["种族"] = name_
-            dict_in["简介"] = d.get("简介", "N/A")
-            dict_in["效果"] = feature[1]
-            dict_in["类别"] = 2
-            dict_in["imageUrl"] = ""
-            dict_out["ancestry"].append(dict_in)
-        elif type_ == "社群":
-            if name_ not in dict_out["customFieldDefinitions"]["communities"]:
-                dict_out["customFieldDefinitions"]["communities"].append(name_)
-            feature = d.get("描述", "")
-            f_name, f_desc = feature.split("：", 1) if "：" in feature else (feature, "")
-            dict_in["特性"] = f_name
-            dict_in["简介"] = d.get("简介", "N/A")
-            dict_in["描述"] = f_desc
-            dict_in["imageUrl"] = ""
-            dict_out["community"].append(dict_in)
-        elif type_ == "子职":
-            dict_in["描述"] = d.get("描述", "")
-            dict_in["主职"] = d.get("主职", "")
-            dict_in["子职业"] = name_.split("-")[0] if "-" in name_ else name_
-            dict_in["等级"] = d.get("等级", "").replace("基础","基石").replace("进阶","专精").replace("精通","大师")
-            cast = d.get("施法属性", "")
-            dict_in["施法"] = cast if cast else "不可施法"
-            dict_in["imageUrl"] = ""
-            dict_out["subclass"].append(dict_in)
-        elif type_ == "领域卡":
-            domain = d.get("领域", "")
-            if domain not in dict_out["customFieldDefinitions"]["domains"]:
-                dict_out["customFieldDefinitions"]["domains"].append(domain)
-            dict_in["领域"] = domain
-            dict_in["等级"] = int(d.get("等级", ""))
-            dict_in["属性"] = d.get("属性", "")
-            recall = d.get("回想", "")
-            dict_in["回想"] = int(recall) if recall.isdigit() else recall
-            dict_in["描述"] = d.get("描述", "")
-            dict_in["imageUrl"] = ""
-            dict_out["domain"].append(dict_in)
-        else:
-            if type_ not in dict_out["customFieldDefinitions"]["variants"]:
-                dict_out["customFieldDefinitions"]["variants"].append(type_)
-            info = d.get("简略信息", "")
-            attr_parts = info.split("/") if info else []
-            feat = d.get("特性", "")
-            d["效果"] = feat
-            d["简略信息"] = {f"item{i}": attr_parts[i] for i in range(len(attr_parts))}
-            dict_in.update(d)
-            dict_out["variant"].append(dict_in)            
+        handler = _ZZZ_HANDLERS.get(d.get("类型", ""), _zzz_variant)
+        handler(d, dict_out, seen)
     return dict_out
 
+def _rrr_profession(d: Dict, race_dict: Dict[str, Dict]) -> Optional[Dict]:
+    get = d.get
+    return {
+        "名称": get("名称", ""),
+        "原名": get("id", ""),
+        "类型": "主职",
+        "领域": get("领域1", "") + "+" + get("领域2", ""),
+        "初始闪避值": get("起始闪避", ""),
+        "初始生命点": get("起始生命", ""),
+        "希望特性": get("希望特性", ""),
+        "职业特性": get("职业特性", ""),
+        "背景问题": get("背景问题", []),
+        "关系问题": get("关系问题", []),
+        "简介": get("简介", ""),
+    }
+
+def _rrr_ancestry(d: Dict, race_dict: Dict[str, Dict]) -> Optional[Dict]:
+    # 同一种族的多条特性合并为一条，全部处理完后再输出
+    get = d.get
+    race_name = get("种族", "")
+    feature = get("名称", "") + "：" + get("效果", "")
+    race = race_dict.get(race_name)
+    if race:
+        race["描述"] = race["描述"] + "\n" + feature
+    else:
+        race_dict[race_name] = {
+            "名称": race_name,
+            "原名": "",
+            "类型": "种族",
+            "简介": get("简介", ""),
+            "描述": feature,
+        }
+    return None
+
+def _rrr_community(d: Dict, race_dict: Dict[str, Dict]) -> Optional[Dict]:
+    get = d.get
+    return {
+        "名称": get("名称", ""),
+        "原名": get("id", ""),
+        "类型": "社群",
+        "简介": get("简介", ""),
+        "性格": "",
+        "描述": get("特性", "") + "：" + get("描述", ""),
+    }
+
+def _rrr_subclass(d: Dict, race_dict: Dict[str, Dict]) -> Optional[Dict]:
+    get = d.get
+    lv = _LEVEL_RRR_RE.sub(lambda m: _LEVEL_RRR2ZZZ[m.group()], get("等级", ""))
+    return {
+        "名称": get("子职业", "") + "-" + lv,
+        "原名": "",
+        "类型": "子职",
+        "主职": get("主职", ""),
+        "等级": lv,
+        "施法属性": get("施法", ""),
+        "描述": get("描述", ""),
+    }
+
+def _rrr_domain(d: Dict, race_dict: Dict[str, Dict]) -> Optional[Dict]:
+    get = d.get
+    return {
+        "名称": get("名称", ""),
+        "原名": get("id", ""),
+        "类型": "领域卡",
+        "领域": get("领域", ""),
+        "等级": str(get("等级", "")),
+        "属性": get("属性", ""),
+        "回想": str(get("回想", "")),
+        "描述": get("描述", ""),
+    }
+
+def _rrr_variant(d: Dict, race_dict: Dict[str, Dict]) -> Optional[Dict]:
+    d.pop("id", None)
+    d.pop("imageUrl", None)
+    d["简略信息"] = "/".join(str(v) for v in d.get("简略信息", "").values() if v)
+    return {k: v for k, v in d.items() if v}
+
+# rrr 各分类的处理顺序及处理函数；返回 None 表示该条目不直接输出
+_RRR_HANDLERS: Dict[str, Callable[[Dict, Dict[str, Dict]], Optional[Dict]]] = {
+    "profession": _rrr_profession,
+    "ancestry": _rrr_ancestry,
+    "community": _rrr_community,
+    "subclass": _rrr_subclass,
+    "domain": _rrr_domain,
+    "variant": _rrr_variant,
+}
+
 def work_rrr(data: List[Any]) -> Any:
     dict_out = []
     race_dict = {}
     for dat in data:
-        for key in ["profession", "ancestry", "community", "subclass", "domain", "variant"]:
+        for key, handler in _RRR_HANDLERS.items():
             da = dat.get(key, None)
             if da:
                 if isinstance(da, dict):
                     da = [da]
-                for d in da:                    
-                    dict_in = {}
-                    if key == "profession":
-                        dict_in["名称"] = d.get("名称", "")
-                        dict_in["原名"] = d.get("id", "")
-                        dict_in["类型"] = "主职"
-                        dict_in["领域"] = d.get("领域1", "") + "+" + d.get("领域2", "")
-                        dict_in["初始闪避值"] = d.get("起始闪避", "")
-                        dict_in["初始生命点"] = d.get("起始生命", "")
-                        dict_in["希望特性"] = d.get("希望特性", "")
-                        dict_in["职业特性"] = d.get("职业特性", "")
-                        dict_in["背景问题"] = d.get("背景问题", [])
-                        dict_in["关系问题"] = d.get("关系问题", [])
-                        dict_in["简介"] = d.get("简介", "")
-                    elif key == "ancestry":
-                        race_name = d.get("种族", "")
-                        if race_dict.get(race_name, False):
-                            race_dict[race_name]["描述"] = race_dict[race_name]["描述"] + "\n" + d.get("名称", "") + "：" + d.get("效果", "")
-                        else:
-                            r = {}
-                            r["名称"] = race_name
-                            r["原名"] = ""
-                            r["类型"] = "种族"
-                            r["简介"] = d.get("简介", "")
-                            r["描述"] = d.get("名称", "") + "：" + d.get("效果", "")
-                            race_dict[race_name] = r
-                        continue
-                    elif key == "community":
-                        dict_in["名称"] = d.get("名称", "")
-                        dict_in["原名"] = d.get("id", "")
-                        dict_in["类型"] = "社群"
-                        dict_in["简介"] = d.get("简介", "")
-                        dict_in["性格"] = ""
-                        dict_in["描述"] = d.get("特性", "") + "：" + d.get("描述", "")
-                    elif key == "subclass":
-                        lv = d.get("等级", "").replace("基石","基础").replace("专精","进阶").replace("大师","精通")
-                        dict_in["名称"] = d.get("子职业", "") + "-" + lv
-                        dict_in["原名"] = ""
-                        dict_in["类型"] = "子职"
-                        dict_in["主职"] = d.get("主职", "")
-                        dict_in["等级"] = lv
-                        dict_in["施法属性"] = d.get("施法", "")
-                        dict_in["描述"] = d.get("描述", "")
-                    elif key == "domain":
-                        dict_in["名称"] = d.get("名称", "")
-                        dict_in["原名"] = d.get("id", "")
-                        dict_in["类型"] = "领域卡"
-                        dict_in["领域"] = d.get("领域", "")
-                        dict_in["等级"] = str(d.get("等级", ""))
-                        dict_in["属性"] = d.get("属性", "")
-                        dict_in["回想"] = str(d.get("回想", ""))
-                        dict_in["描述"] = d.get("描述", "")
-                    elif key == "variant":
-                        d.pop("id", None)
-                        d.pop("imageUrl", None)
-                        attr = ""
-                        for k,v in d.get("简略信息", "").items():
-                            if v:
-                                attr = attr + f"{v}/"
-                        d["简略信息"] = attr[:-1] if attr else ""
-                        for k,v in d.items():
-                            if v:
-                                dict_in[k] = v
-                    dict_out.append(dict_in)
+                for d in da:
+                    dict_in = handler(d, race_dict)
+                    if dict_in is not None:
+                        dict_out.append(dict_in)
 
     for _,r in race_dict.items():
         dict_out.append(r)
@@ -325,7 +405,10 @@ def main():
     group = parser.add_mutually_exclusive_group(required=False)  # 改为可选，因为.dhcb文件固定模式
     group.add_argument('--zzz', action='store_true', help='使用zzz模式')
     group.add_argument('--rrr', action='store_true', help='使用rrr模式')
+    parser.add_argument('--compact', action='store_true', help='输出不带缩进的紧凑 JSON（默认缩进 2 格）')
     args = parser.parse_args()
+    # 警告统一经 logging 输出到 stderr，只保留消息本身
+    logging.basicConfig(format='%(message)s')
 
     # 检查输入文件扩展名
     input_lower = args.input.lower()
@@ -349,8 +432,7 @@ def main():
     data = collect_data(args.input)
     result = work_function(data, mode, args.input)
     json_output_path = os.path.splitext(args.input)[0] + f"_{to_mode}.json"
-    with open(json_output_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    fastdump(result, json_output_path, pretty=not args.compact)
     print(f"结果已保存到 {json_output_path}")
 
 